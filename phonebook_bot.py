@@ -13,10 +13,10 @@
     - 'birthdays': displays contacts with upcoming birthdays within the next week.
     - 'hello': responds with a greeting message.
     - 'info': shows a list of available commands and their descriptions.
-    - 'close' or 'exit': exits the bot, saving all contact data.
+    - 'close' or 'exit': exits the bot, saving any changes to contact data.
 
     Data persistence:
-    - the bot saves data automatically upon exit to ensure all changes are retained for the next session.
+    - the bot saves data automatically upon exit to ensure all changes are retained for the next session; sessions that change nothing skip the save.
     - contacts and birthdays are stored in a file ('addressbook.pkl') in binary format using the `pickle` library, and they are loaded upon starting the bot to maintain continuity.
 
     Error handling:
@@ -35,11 +35,16 @@
 
 
 from collections import UserDict
-from datetime import datetime
-import re
-from datetime import datetime, timedelta
+from datetime import datetime, date, timedelta
 from colorama import Fore
 import pickle
+import pickletools
+
+
+GREEN, RED, YELLOW, RESET = Fore.GREEN, Fore.RED, Fore.YELLOW, Fore.RESET
+
+# Days to move a birthday by, indexed by weekday(): weekends go to Monday.
+WEEKEND_SHIFT = (0, 0, 0, 0, 0, 2, 1)
 
 
 class Field:
@@ -56,7 +61,7 @@ class Name(Field):
 
 class Phone(Field):
     def __init__(self, value):
-        if re.match(r'^\d{10}$', value):
+        if len(value) == 10 and value.isdecimal():
             super().__init__(value)
         else:
             raise ValueError("Invalid phone number. The number must consist of 10 digits.")
@@ -64,60 +69,108 @@ class Phone(Field):
 
 class Birthday(Field):
     def __init__(self, value):
+        try:
+            birthday = datetime.strptime(value, '%d.%m.%Y').date()
+        except ValueError:
+            raise ValueError("Invalid date format. Use the 'DD.MM.YYYY' format.")
 
-        if re.match(r'^\d{2}\.\d{2}\.\d{4}$', value):
-            try:
-                birthday = datetime.strptime(value, '%d.%m.%Y').date()
-            except:
-                raise ValueError("Invalid date format. Ensure it exist.")
-            
-            super().__init__(birthday)
+        super().__init__(birthday)
+
+    def __str__(self):
+        return self.value.strftime('%d.%m.%Y')
 
-        else:
-            raise ValueError("Invalid date format. Use the 'DD.MM.YYYY' format.")
-        
 
 class Record:
     def __init__(self, name):
-        self.name = name
+        self.name = name.value if isinstance(name, Name) else str(name)
         self.phones = []
+        self._phone_index = {}
         self.birthday = None
 
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        if isinstance(self.birthday, str):
+            try:
+                self.birthday = Birthday(self.birthday)
+            except ValueError:
+                self.birthday = None
+        # Older versions allowed the same number to be added more than once.
+        self.phones = list({p.value: p for p in self.phones}.values())
+        self._reindex_phones()
+
     def __str__(self):
         phones = '; '.join(str(p) for p in self.phones)
         birthday_str = f", birthday: {self.birthday}" if self.birthday else ""
         return f"Contact name: {self.name}, phones: {phones}{birthday_str}"
 
+    def _reindex_phones(self):
+        self._phone_index = {}
+        for index, phone in enumerate(self.phones):
+            self._phone_index[phone.value] = index
+
     def add_phone(self, phone: Phone):
+            if phone.value in self._phone_index:
+                raise ValueError(f"Phone {phone} already exists for contact {self.name}.")
+            self._phone_index[phone.value] = len(self.phones)
             self.phones.append(phone)
             return (f"Phone {phone} added to contact {self.name}")
         
     def remove_phone(self, phone):
-        self.phones = [p for p in self.phones if p == phone]
+        if phone not in self._phone_index:
+            return f"Phone {phone} not found"
+
+        self.phones = [p for p in self.phones if p.value != phone]
+        self._reindex_phones()
         return (f"Phone {phone} deleted")
     
     def edit_phone(self, old_phone, new_phone):
-        for index, phone in enumerate(self.phones):
-            if phone.value == old_phone:
-                self.phones[index] = Phone(new_phone)
-                return f"Phone {old_phone} changed to {new_phone}"
-        return f"Phone {old_phone} not found"
+        index = self._phone_index.get(old_phone)
+        if index is None:
+            return False
+        if new_phone != old_phone and new_phone in self._phone_index:
+            raise ValueError(f"Phone {new_phone} already exists for contact {self.name}.")
+
+        self.phones[index] = Phone(new_phone)
+        del self._phone_index[old_phone]
+        self._phone_index[new_phone] = index
+        return True
 
     def find_phone(self, phone):
-        for p in self.phones:
-            if p == phone:
-                return p
-            elif p not in self.phones:
-                return (f"Phone {phone} not found")
+        index = self._phone_index.get(phone)
+        if index is None:
+            return (f"Phone {phone} not found")
+        return self.phones[index]
 
     def add_birthday(self, birthday: Birthday):
         self.birthday = birthday
         return (f"{self.name}'s birthday on {birthday} added")
        
 
+def birthday_in_year(birthday, year):
+    # A 29.02 birthday is celebrated on 28.02 in non-leap years.
+    try:
+        return birthday.replace(year=year)
+    except ValueError:
+        return birthday.replace(year=year, day=28)
+
+
 class AddressBook(UserDict):
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.dirty = False
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state.pop('dirty', None)
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self.dirty = False
+
     def add_record(self, record):
-        self.data[str(record.name)] = record
+        self.data[record.name] = record
+        self.dirty = True
         return (f"Contact {record.name} added to address book")
 
     def find(self, name):
@@ -127,40 +180,33 @@ class AddressBook(UserDict):
     def delete(self, name):
         if name in self.data:
             del self.data[name]
+            self.dirty = True
             return (f"Contact {name} deleted")
         else:
             return (f"Contact {name} not found")
     
     def get_upcoming_birthdays(self):
         congrats_list = []
-        today = datetime.now().date()
+        today = date.today()
+        today_ordinal = today.toordinal()
+        year = today.year
 
         for contact in self.data.values():
             if contact.birthday:
-                birthday = datetime.strptime(contact.birthday, "%d.%m.%Y").date()
-                birthday_this_year = birthday.replace(year=today.year)
+                birthday = contact.birthday.value
+                birthday_this_year = birthday_in_year(birthday, year)
+                days_until_birthday = birthday_this_year.toordinal() - today_ordinal
 
-                if birthday_this_year < today:
-                    birthday_this_year = birthday.replace(year=today.year + 1)
-            
-                days_until_birthday = (birthday_this_year - today).days
+                if days_until_birthday < 0:
+                    birthday_this_year = birthday_in_year(birthday, year + 1)
+                    days_until_birthday = birthday_this_year.toordinal() - today_ordinal
 
                 if 0 <= days_until_birthday <= 7:
+                    birthday_this_year += timedelta(days=WEEKEND_SHIFT[birthday_this_year.weekday()])
+                    congrats_list.append((contact.name, birthday_this_year.strftime("%d.%m.%Y")))
 
-                    if birthday_this_year.weekday() == 5:
-                        birthday_this_year += timedelta(days=2)
-                    elif birthday_this_year.weekday() == 6:
-                        birthday_this_year += timedelta(days=1)
+        return congrats_list
 
-                    congrats_list.append({ contact.name: birthday_this_year.strftime("%d.%m.%Y") })
-            
-
-        if len(congrats_list) > 0:
-            return congrats_list
-        else:
-            return None
-
-        
 
 
 
@@ -170,11 +216,7 @@ def input_error(func):
     def inner(*args, **kwargs):
         try:
             return func(*args, **kwargs)
-        except KeyError as e:
-            return e
-        except ValueError as e:
-            return e
-        except IndexError as e:
+        except (KeyError, ValueError, IndexError) as e:
             return e
         except Exception as e:
             return f'An unexpected error occurred: {e}. Please try again.'
@@ -185,18 +227,17 @@ def parse_input(user_input):
         return None, []
     
     cmd, *args = user_input.split()
-    cmd = cmd.strip().lower()
-    return cmd, *args
+    return cmd.lower(), *args
 
 
 def colored_output(phrase):
-    return Fore.GREEN + phrase + Fore.RESET
+    return f"{GREEN}{phrase}{RESET}"
 
 def colored_error(phrase):
-    return Fore.RED + phrase + Fore.RESET
+    return f"{RED}{phrase}{RESET}"
 
 def colored_info(phrase):
-    return Fore.YELLOW + phrase + Fore.RESET
+    return f"{YELLOW}{phrase}{RESET}"
 
 
 
@@ -209,15 +250,13 @@ def add_contact(args, book: AddressBook):
     
     if record is None:
         record = Record(name)
-        book.add_record(record)
-        message = colored_output(f"Contact {record.name} added to address book.")
-    else:
-        message = colored_output(f"Contact {record.name} updated.")
-
-    if phone:
         record.add_phone(Phone(phone))
+        book.add_record(record)
+        return colored_output(f"Contact {record.name} added to address book.")
 
-    return message
+    record.add_phone(Phone(phone))
+    book.dirty = True
+    return colored_output(f"Contact {record.name} updated.")
 
 @input_error
 def change_contact(args, book: AddressBook):
@@ -227,9 +266,11 @@ def change_contact(args, book: AddressBook):
     if record is None:
         raise IndexError(colored_error(f"Contact '{name}' not found. Use 'add' to create it."))
     
-    result = record.edit_phone(old_phone, new_phone)
+    if not record.edit_phone(old_phone, new_phone):
+        return colored_output(f"Phone {old_phone} not found")
 
-    return colored_output(result)
+    book.dirty = True
+    return colored_output(f"Phone {old_phone} changed to {new_phone}")
 
 @input_error
 def show_phone(args, book: AddressBook):
@@ -249,8 +290,7 @@ def show_all(book: AddressBook):
     if not book.data:
         raise ValueError(colored_error("No contacts available."))
     
-    result = [f"{record}" for _, record in book.data.items()]
-    return colored_output('\n'.join(result))
+    return colored_output('\n'.join(str(record) for record in book.data.values()))
 
 @input_error
 def add_birthday(args, book: AddressBook):
@@ -259,7 +299,8 @@ def add_birthday(args, book: AddressBook):
     if not record:
         raise IndexError(colored_error(f"Contact '{name}' not found. Use 'add' to create it."))
     
-    result = record.add_birthday(birthday)
+    result = record.add_birthday(Birthday(birthday))
+    book.dirty = True
     return colored_output(result)
 
 @input_error
@@ -282,32 +323,35 @@ def show_all_birthdays(book: AddressBook):
     if not result:
         return colored_output("No birthdays soon.")
     
-    formatted_result = [f'{name}: {date}' for birthday_dict in result for name, date in birthday_dict.items()]
+    formatted_result = [f'{name}: {day}' for name, day in result]
     return colored_output('\n'.join(formatted_result))
     
     
 
+_INFO_TEXT = colored_info("Available commands:\n" + '\n'.join([
+    colored_output('add <name> <phone>') + ': adds a new contact with the name and phone number, or adds a phone number to an existing contact (e.g., add John 123456789)',
+    colored_output('change <name> <old phone> <new phone>') + ': changes the phone number of an existing contact (e.g., change John 123456789 987654321)',
+    colored_output('phone <name>') + ': shows the phone number(s) of the specified contact (e.g., phone John)',
+    colored_output('all') + ': shows all contacts in your address book',
+    colored_output('add-birthday <name> <birthday>') + ': adds a birthday for the specified contact (e.g., add-birthday John 01.01.1990)',
+    colored_output('show-birthday <name>') + ': shows the birthday of the specified contact (e.g., show-birthday John)',
+    colored_output('birthdays') + ': shows upcoming birthdays within the next week',
+    colored_output('hello') + ': receive a greeting from the bot',
+    colored_output('info') + ': displays the list of available commands',
+    colored_output('close or exit') + ': exits the application'
+]))
+
+
 def show_info():
-    result = [
-        colored_output('add <name> <phone>') + ': adds a new contact with the name and phone number, or adds a phone number to an existing contact (e.g., add John 123456789)',
-        colored_output('change <name> <old phone> <new phone>') + ': changes the phone number of an existing contact (e.g., change John 123456789 987654321)',
-        colored_output('phone <name>') + ': shows the phone number(s) of the specified contact (e.g., phone John)',
-        colored_output('all') + ': shows all contacts in your address book',
-        colored_output('add-birthday <name> <birthday>') + ': adds a birthday for the specified contact (e.g., add-birthday John 01.01.1990)',
-        colored_output('show-birthday <name>') + ': shows the birthday of the specified contact (e.g., show-birthday John)',
-        colored_output('birthdays') + ': shows upcoming birthdays within the next week',
-        colored_output('hello') + ': receive a greeting from the bot',
-        colored_output('info') + ': displays the list of available commands',
-        colored_output('close or exit') + ': exits the application'
-    ]
-    return colored_info("Available commands:\n" + '\n'.join(result))
+    return _INFO_TEXT
 
 
 
 
 def save_data(book, filename="addressbook.pkl"):
+    data = pickletools.optimize(pickle.dumps(book, protocol=pickle.HIGHEST_PROTOCOL))
     with open(filename, 'wb') as f:
-        pickle.dump(book, f)
+        f.write(data)
 
 def load_data(filename="addressbook.pkl"):
     try:
@@ -319,47 +363,36 @@ def load_data(filename="addressbook.pkl"):
 
 
 
+COMMANDS = {
+    "hello": lambda args, book: colored_info("How can I help you?" + RESET),
+    "info": lambda args, book: show_info(),
+    "add": add_contact,
+    "change": change_contact,
+    "phone": show_phone,
+    "all": lambda args, book: show_all(book),
+    "add-birthday": add_birthday,
+    "show-birthday": show_birthday,
+    "birthdays": lambda args, book: show_all_birthdays(book),
+}
+
+
 def main():
     book = load_data()
-    print(("Welcome to the assistant bot!"))
+    _input = input
+    _print = print
+    _print(("Welcome to the assistant bot!"))
     while True:
-        user_input = input("Enter a command: ")
+        user_input = _input("Enter a command: ")
         command, *args = parse_input(user_input)
 
         if command in ["close", "exit"]:
-            save_data(book)
-            print(colored_info("Good bye!" + Fore.RESET))
+            if book.dirty:
+                save_data(book)
+            _print(colored_info("Good bye!" + RESET))
             break
 
-        elif command == "hello":
-            print(colored_info("How can I help you?" + Fore.RESET)) 
-
-        elif command == "info":
-            print(show_info()) 
-
-        elif command == "add":
-            print(add_contact(args, book)) 
-
-        elif command == "change":
-            print(change_contact(args, book)) 
-
-        elif command == "phone":
-            print(show_phone(args, book)) 
-
-        elif command == "all":
-            print(show_all(book)) 
-
-        elif command == "add-birthday":
-            print(add_birthday(args, book))
-
-        elif command == "show-birthday":
-            print(show_birthday(args, book)) 
-
-        elif command == "birthdays":
-            print(show_all_birthdays(book))
-
-        else:
-            print(colored_error("Invalid command."))
+        handler = COMMANDS.get(command)
+        _print(handler(args, book) if handler else colored_error("Invalid command."))
 
 if __name__ == "__main__":
     main()
\ No newline at end of file